@@ -2,23 +2,379 @@
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 import xml.etree.ElementTree as ET
+import argparse
 import csv
+import hashlib
+import json
+import math
+import multiprocessing
 import os
+import pathlib
+import pickle
+import re
+import shutil
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
+import matplotlib
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.patches import Patch
 import seaborn as sns
 import networkx as nx
 
-# Fonction utilitaire pour limiter à 20 catégories : retourne les 19 premières et regroupe le reste sous "Other"
-def limit_top_20(series):
-    series = series.sort_values(ascending=False)
-    if len(series) <= 20:
-        return series
-    top19 = series.iloc[:19]
-    other_sum = series.iloc[19:].sum()
-    return pd.concat([top19, pd.Series([other_sum], index=["Other"])])
+# Fonction utilitaire pour limiter à N catégories : retourne les N-1 premières et regroupe le reste sous "Other"
+# (sélection partielle avec nlargest plutôt qu'un tri complet de la série)
+def limit_top_n(series, n=20):
+    if n < 2:
+        raise ValueError(f"Le nombre de catégories doit être au moins 2 (reçu : {n})")
+    if len(series) <= n:
+        return series.nlargest(len(series))
+    top = series.nlargest(n - 1)
+    other_sum = series.sum() - top.sum()
+    return pd.concat([top, pd.Series([other_sum], index=["Other"])])
+
+# Questions et types de graphiques disponibles (la heatmap et le réseau ne concernent que Q2)
+QUESTIONS = ["Department", "Q1", "Q2", "Q3", "Q4"]
+TYPES_VISU = ["barres", "heatmap", "reseau", "pie", "line"]
+TYPES_VISU_Q2 = ("heatmap", "reseau")
+# Types de graphiques dont les artistes sont réutilisés et mis à jour sur place entre deux vues
+TYPES_VISU_INCREMENTAUX = ("barres", "pie", "line")
+FORMATS_RAPPORT = ("png", "svg", "pdf")
+
+# Fonction utilitaire pour typer les colonnes : les colonnes texte peu variées deviennent catégorielles
+def typer_colonnes(df):
+    for col in df.columns:
+        if pd.api.types.is_string_dtype(df[col]) and df[col].nunique() <= len(df) // 2:
+            df[col] = df[col].astype("category")
+    return df
+
+# Classe gérant le cache de session sur disque (données typées, agrégats, positions du réseau et dernière vue)
+# Chaque session est un dossier nommé par l'empreinte du fichier source :
+#   - une colonne par fichier .npy (codes des colonnes catégorielles, valeurs des colonnes numériques),
+#     relu en projection mémoire (mmap_mode="r") sans copier les données ;
+#   - donnees.pkl : noms des colonnes et catégories, écrit en dernier et une seule fois par empreinte ;
+#   - session.pkl : agrégats, positions du réseau et dernière vue, réécrit à chaque sauvegarde.
+class CacheSession:
+    DOSSIER_DEFAUT = os.path.join(os.path.expanduser("~"), ".cache", "xfdf2csv_visualizer")
+    TAILLE_MAX = 500 * 1024 * 1024  # Taille maximale du cache en octets
+
+    def __init__(self, dossier=DOSSIER_DEFAUT, taille_max=TAILLE_MAX):
+        self.dossier = dossier
+        self.taille_max = taille_max
+
+    # Calcul de la clé de cache à partir de l'empreinte SHA-256 du fichier source
+    def cle(self, fichier):
+        empreinte = hashlib.sha256()
+        with open(fichier, "rb") as f:
+            for bloc in iter(lambda: f.read(1024 * 1024), b""):
+                empreinte.update(bloc)
+        return empreinte.hexdigest()
+
+    def _chemin(self, cle):
+        return os.path.join(self.dossier, cle)
+
+    # Lecture de l'état d'une session, ou None si absente ou illisible
+    # Les colonnes du DataFrame restent projetées en mémoire : seules les catégories sont lues
+    def charger(self, cle):
+        chemin = self._chemin(cle)
+        if not os.path.exists(os.path.join(chemin, "session.pkl")):
+            return None
+        try:
+            with open(os.path.join(chemin, "donnees.pkl"), "rb") as f:
+                colonnes = pickle.load(f)
+            with open(os.path.join(chemin, "session.pkl"), "rb") as f:
+                etat = pickle.load(f)
+            donnees = {}
+            for i, (nom, categories) in enumerate(colonnes):
+                tableau = np.load(os.path.join(chemin, f"{i}.npy"), mmap_mode="r")
+                donnees[nom] = tableau if categories is None else pd.Categorical.from_codes(tableau, categories)
+            etat["df"] = pd.DataFrame(donnees, copy=False)
+        except Exception:
+            shutil.rmtree(chemin, ignore_errors=True)
+            return None
+        # Mise à jour de la date d'accès pour l'éviction (la plus ancienne session est supprimée en premier)
+        os.utime(os.path.join(chemin, "session.pkl"))
+        return etat
+
+    # Écriture d'une session, puis éviction si la taille maximale est dépassée
+    # Les colonnes ne sont écrites qu'une fois (elles ne dépendent que du fichier source) ; l'état de la
+    # session est remplacé de façon atomique
+    def sauvegarder(self, cle, etat):
+        chemin = self._chemin(cle)
+        os.makedirs(chemin, exist_ok=True)
+        if not os.path.exists(os.path.join(chemin, "donnees.pkl")):
+            colonnes = []
+            for i, nom in enumerate(etat["df"].columns):
+                serie = etat["df"][nom]
+                if not pd.api.types.is_numeric_dtype(serie) or isinstance(serie.dtype, pd.CategoricalDtype):
+                    serie = serie.astype("category")
+                    np.save(os.path.join(chemin, f"{i}.npy"), serie.cat.codes.to_numpy())
+                    colonnes.append((nom, serie.cat.categories.tolist()))
+                else:
+                    np.save(os.path.join(chemin, f"{i}.npy"), serie.to_numpy())
+                    colonnes.append((nom, None))
+            with open(os.path.join(chemin, "donnees.pkl.tmp"), "wb") as f:
+                pickle.dump(colonnes, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(os.path.join(chemin, "donnees.pkl.tmp"), os.path.join(chemin, "donnees.pkl"))
+        session = {cle_etat: valeur for cle_etat, valeur in etat.items() if cle_etat != "df"}
+        with open(os.path.join(chemin, "session.pkl.tmp"), "wb") as f:
+            pickle.dump(session, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(os.path.join(chemin, "session.pkl.tmp"), os.path.join(chemin, "session.pkl"))
+        self._evincer(chemin)
+
+    # Taille totale des fichiers d'une session
+    def _taille(self, chemin):
+        return sum(os.path.getsize(os.path.join(chemin, nom)) for nom in os.listdir(chemin))
+
+    # Date de dernière utilisation d'une session (0 pour une session incomplète)
+    def _date_utilisation(self, chemin):
+        session = os.path.join(chemin, "session.pkl")
+        return os.path.getmtime(session) if os.path.exists(session) else 0
+
+    # Suppression des sessions les moins récemment utilisées jusqu'à respecter la taille maximale
+    def _evincer(self, chemin_courant):
+        sessions = [os.path.join(self.dossier, nom) for nom in os.listdir(self.dossier)
+                    if os.path.isdir(os.path.join(self.dossier, nom))]
+        sessions.sort(key=self._date_utilisation)
+        tailles = {chemin: self._taille(chemin) for chemin in sessions}
+        taille_totale = sum(tailles.values())
+        for chemin in sessions:
+            if taille_totale <= self.taille_max:
+                break
+            if chemin == chemin_courant:
+                continue
+            taille_totale -= tailles[chemin]
+            shutil.rmtree(chemin, ignore_errors=True)
+
+# Classe gérant la base SQLite d'analyse : les réponses y sont stockées déjà filtrées (une ligne par réponse
+# "Oui" pour Q1, Q3, Q4 et par nom cité pour Q2), ce qui permet d'obtenir les comptages par GROUP BY
+class SourceSQLite:
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS repondants (
+            id INTEGER PRIMARY KEY,
+            fichier TEXT UNIQUE,
+            a_name TEXT,
+            department TEXT
+        );
+        CREATE TABLE IF NOT EXISTS reponses (
+            id_repondant INTEGER REFERENCES repondants(id),
+            question TEXT,
+            categorie TEXT,
+            reponse TEXT
+        );
+    """
+    INDEX = """
+        CREATE INDEX IF NOT EXISTS idx_repondants_department ON repondants(department);
+        CREATE INDEX IF NOT EXISTS idx_reponses_categorie ON reponses(question, categorie);
+        CREATE INDEX IF NOT EXISTS idx_reponses_reponse ON reponses(question, reponse);
+        ANALYZE;
+    """
+
+    # Colonnes attendues de chaque table, vérifiées à l'ouverture d'une base existante
+    COLONNES = {
+        "repondants": {"id", "fichier", "a_name", "department"},
+        "reponses": {"id_repondant", "question", "categorie", "reponse"},
+    }
+
+    # Avec creer=True (conversion), la base est ouverte en écriture et le schéma est créé ; sinon (analyse),
+    # elle est ouverte en lecture seule et doit déjà contenir les tables attendues
+    def __init__(self, chemin, creer=False):
+        self.chemin = chemin
+        if creer:
+            self.connexion = sqlite3.connect(chemin)
+            self.connexion.executescript(self.SCHEMA)
+            return
+        self.connexion = sqlite3.connect(pathlib.Path(chemin).resolve().as_uri() + "?mode=ro", uri=True)
+        try:
+            for table, colonnes in self.COLONNES.items():
+                presentes = {ligne[1] for ligne in self.connexion.execute(f"PRAGMA table_info({table})")}
+                if not colonnes <= presentes:
+                    raise ValueError(f"{chemin} n'est pas une base d'analyse XFDF2CSV (table {table} absente ou incomplète)")
+        except Exception:
+            self.connexion.close()
+            raise
+
+    # Insertion d'un lot de lignes (nom du fichier source, ligne CSV) ; un fichier déjà inséré est ignoré
+    def inserer(self, lignes):
+        with self.connexion:
+            curseur = self.connexion.cursor()
+            for fichier, ligne in lignes:
+                curseur.execute(
+                    "INSERT OR IGNORE INTO repondants (fichier, a_name, department) VALUES (?, ?, ?)",
+                    (fichier, ligne.get("A-Name") or None, ligne.get("Department") or None)
+                )
+                if curseur.rowcount == 0:
+                    continue
+                id_repondant = curseur.lastrowid
+                reponses = []
+                for col, valeur in ligne.items():
+                    question = col.split("-")[0]
+                    if question == "Q2" and valeur and valeur != "----":
+                        reponses.append((id_repondant, question, col, valeur))
+                    elif question in ("Q1", "Q3", "Q4") and valeur == "Oui":
+                        reponses.append((id_repondant, question, col, valeur))
+                curseur.executemany("INSERT INTO reponses VALUES (?, ?, ?, ?)", reponses)
+
+    # Création des index (après les insertions, plus rapide que de les maintenir pendant le chargement)
+    def indexer(self):
+        self.connexion.executescript(self.INDEX)
+
+    def fermer(self):
+        self.connexion.close()
+
+    # Liste des noms des répondants (coloration du graphique réseau)
+    def noms(self):
+        return [nom for (nom,) in self.connexion.execute("SELECT DISTINCT a_name FROM repondants WHERE a_name IS NOT NULL")]
+
+    # Préparation des données d'une question : comptages par GROUP BY, ou lignes détaillées pour la heatmap
+    # et le réseau, qui ont besoin des couples (A-Name, Réponse)
+    def preparer(self, question, type_visu=None):
+        params = (question,)
+        if question == "Department":
+            requete = ("SELECT department AS Department, COUNT(*) AS count FROM repondants "
+                       "WHERE department IS NOT NULL GROUP BY department")
+            params = ()
+        elif type_visu in TYPES_VISU_Q2:
+            requete = ('SELECT p.a_name AS "A-Name", p.department AS Department, r.reponse AS "Réponse" '
+                       "FROM reponses r JOIN repondants p ON p.id = r.id_repondant WHERE r.question = ?")
+        elif question == "Q2":
+            requete = 'SELECT reponse AS "Réponse", COUNT(*) AS count FROM reponses WHERE question = ? GROUP BY reponse'
+        else:
+            requete = 'SELECT categorie AS "Catégorie", COUNT(*) AS count FROM reponses WHERE question = ? GROUP BY categorie'
+        return pd.read_sql_query(requete, self.connexion, params=params)
+
+# Délai maximal d'analyse d'un fichier XFDF (en secondes) et nombre de fichiers par lot de conversion
+DELAI_FICHIER_XFDF = 30
+TAILLE_LOT_XFDF = 500
+
+# Fonction pour lire un fichier XFDF et retourner la ligne CSV correspondante (exécutée dans un processus séparé)
+def lire_fichier_xfdf(file_path, columns_order):
+    tree = ET.parse(file_path)
+    root = tree.getroot()
+    data_row = {col: "" for col in columns_order}
+    for field in root.findall(".//{http://ns.adobe.com/xfdf/}field"):
+        field_name = field.get("name")
+        value_element = field.find("{http://ns.adobe.com/xfdf/}value")
+        field_value = value_element.text if value_element is not None else ""
+        if field_name in data_row:
+            data_row[field_name] = field_value
+    return data_row
+
+# Fonction pour analyser un lot de fichiers XFDF en isolant les erreurs et les dépassements de délai
+# La pool est partagée par tous les lots ; elle n'est remplacée que lorsqu'un fichier dépasse le délai.
+# Retourne les lignes des fichiers valides (dans l'ordre du lot), la liste des fichiers mis en quarantaine
+# et la pool à utiliser pour les lots suivants
+def _convertir_lot_xfdf(pool, input_folder, lot, columns_order, delai, processus):
+    lignes = {}
+    quarantaine = []
+    en_attente = lot
+    while en_attente:
+        taches = [(nom, pool.apply_async(lire_fichier_xfdf, (os.path.join(input_folder, nom), columns_order)))
+                  for nom in en_attente]
+        en_attente = []
+        for i, (nom, tache) in enumerate(taches):
+            try:
+                lignes[nom] = tache.get(timeout=delai)
+            except multiprocessing.TimeoutError:
+                quarantaine.append({"fichier": nom, "erreur": "Timeout",
+                                    "message": f"Analyse interrompue après {delai} s"})
+                # Un processus reste bloqué sur ce fichier : la pool est terminée et remplacée,
+                # puis les fichiers restants du lot y sont relancés
+                pool.terminate()
+                pool.join()
+                pool = multiprocessing.Pool(processus)
+                en_attente = [autre for autre, _ in taches[i + 1:]]
+                break
+            except Exception as e:
+                quarantaine.append({"fichier": nom, "erreur": type(e).__name__, "message": str(e)})
+    return [(nom, lignes[nom]) for nom in lot if nom in lignes], quarantaine, pool
+
+# Fonction pour convertir un dossier XFDF en CSV horizontal, avec reprise après interruption
+# Les lignes sont ajoutées lot par lot à un fichier partiel ; un journal (une ligne JSON par lot) enregistre
+# les fichiers traités et la taille du fichier partiel, ce qui permet de reprendre une conversion interrompue.
+# Les lignes peuvent aussi être écrites directement dans une base SQLite d'analyse (base_sqlite).
+# Retourne le rapport d'erreurs, également écrit au format JSON à côté du fichier CSV.
+def convertir_dossier_xfdf(input_folder, output_csv_file, columns_order, delai=DELAI_FICHIER_XFDF,
+                           processus=None, taille_lot=TAILLE_LOT_XFDF, base_sqlite=None):
+    fichier_partiel = output_csv_file + ".partiel"
+    fichier_journal = output_csv_file + ".journal"
+    fichier_rapport = output_csv_file + ".erreurs.json"
+    fichiers = sorted(nom for nom in os.listdir(input_folder) if nom.lower().endswith(".xfdf"))
+    # Lecture du journal d'une conversion précédente interrompue (une dernière ligne incomplète est ignorée)
+    traites = set()
+    quarantaine = []
+    taille_csv = None
+    if os.path.exists(fichier_journal) and os.path.exists(fichier_partiel):
+        with open(fichier_journal, encoding="utf-8") as journal:
+            for ligne in journal:
+                try:
+                    entree = json.loads(ligne)
+                except json.JSONDecodeError:
+                    break
+                if entree["dossier"] != os.path.abspath(input_folder):
+                    traites, quarantaine, taille_csv = set(), [], None
+                    break
+                traites.update(entree["fichiers"])
+                quarantaine.extend(entree["quarantaine"])
+                taille_csv = entree["taille_csv"]
+    if taille_csv is None:
+        # Nouvelle conversion : création du fichier partiel avec l'en-tête
+        traites, quarantaine = set(), []
+        with open(fichier_partiel, mode='w', newline='', encoding='utf-8') as csvfile:
+            csv.DictWriter(csvfile, fieldnames=columns_order, delimiter=';').writeheader()
+        open(fichier_journal, "w", encoding="utf-8").close()
+        if base_sqlite and os.path.exists(base_sqlite):
+            os.remove(base_sqlite)
+    else:
+        # Reprise : suppression des lignes écrites après le dernier lot journalisé
+        with open(fichier_partiel, "r+b") as csvfile:
+            csvfile.truncate(taille_csv)
+    restants = [nom for nom in fichiers if nom not in traites]
+    source = SourceSQLite(base_sqlite, creer=True) if base_sqlite else None
+    # Une seule pool de processus pour toute la conversion (remplacée seulement après un dépassement de délai)
+    pool = multiprocessing.Pool(processus)
+    with open(fichier_partiel, mode='a', newline='', encoding='utf-8') as csvfile, \
+            open(fichier_journal, mode='a', encoding='utf-8') as journal:
+        writer = csv.DictWriter(csvfile, fieldnames=columns_order, delimiter=';')
+        try:
+            for debut in range(0, len(restants), taille_lot):
+                lot = restants[debut:debut + taille_lot]
+                lignes, quarantaine_lot, pool = _convertir_lot_xfdf(pool, input_folder, lot, columns_order,
+                                                                    delai, processus)
+                # La base est écrite avant le journal ; un lot rejoué après interruption y est ignoré (fichier unique)
+                if source is not None:
+                    source.inserer(lignes)
+                writer.writerows(ligne for _, ligne in lignes)
+                csvfile.flush()
+                os.fsync(csvfile.fileno())
+                quarantaine.extend(quarantaine_lot)
+                journal.write(json.dumps({"dossier": os.path.abspath(input_folder), "fichiers": lot,
+                                          "quarantaine": quarantaine_lot, "taille_csv": csvfile.tell()},
+                                         ensure_ascii=False) + "\n")
+                journal.flush()
+        finally:
+            pool.terminate()
+            pool.join()
+    if source is not None:
+        source.indexer()
+        source.fermer()
+    # Conversion terminée : le fichier partiel devient le CSV final et le rapport d'erreurs est écrit
+    os.replace(fichier_partiel, output_csv_file)
+    os.remove(fichier_journal)
+    rapport = {
+        "dossier": os.path.abspath(input_folder),
+        "fichier_csv": os.path.abspath(output_csv_file),
+        "base_sqlite": os.path.abspath(base_sqlite) if base_sqlite else None,
+        "fichiers_traites": len(fichiers),
+        "fichiers_convertis": len(fichiers) - len(quarantaine),
+        "quarantaine": quarantaine,
+    }
+    with open(fichier_rapport, "w", encoding="utf-8") as f:
+        json.dump(rapport, f, ensure_ascii=False, indent=2)
+    return rapport
 
 # Classe principale gérant l'application de visualisation et conversion CSV
 class VisualisateurCSV:
@@ -28,6 +384,8 @@ class VisualisateurCSV:
     ZOOM_OUT_FACTOR = 0.9
     MIN_ZOOM = 0.5
     MAX_ZOOM = 5.0
+    # Nombre maximal de catégories affichées (les suivantes sont regroupées sous "Other")
+    TOP_N = 20
 
     # Constructeur de la classe : initialisation de l'interface et des variables de l'application
     def __init__(self, racine):
@@ -39,6 +397,14 @@ class VisualisateurCSV:
         self.liste_a_names = []       # Liste des noms utilisés pour la coloration des nœuds
         self.type_visu_actuelle = "barres"  # Type de visualisation par défaut
         self.echelle_actuelle = 1.0         # Facteur d'échelle initial pour le zoom
+        self.top_n = self.TOP_N             # Nombre de catégories affichées dans les graphiques
+        self.cache_top_n = {}               # Comptages top-N déjà calculés, par question
+        self.cache_session = CacheSession() # Cache de session sur disque
+        self.cle_session = None             # Clé de cache du fichier CSV chargé
+        self.source_sql = None              # Base SQLite d'analyse chargée (à la place du CSV)
+        self._vue = None                    # Signature géométrique de la vue affichée
+        self._artistes = None               # Artistes Matplotlib de la vue, mis à jour sur place
+        self._mise_en_page = None           # Question, libellés et valeurs pour lesquels tight_layout a été calculé
         # Dictionnaire contenant les textes des questions à afficher
         self.questions = {
             "Q1": "AVEC QUEL DÉPARTEMENT AIMERAIS-TU TRAVAILLER?",
@@ -49,6 +415,8 @@ class VisualisateurCSV:
         }
         # Configuration de l'interface graphique
         self.configurer_interface()
+        # Sauvegarde de la session à la fermeture de la fenêtre
+        self.racine.protocol("WM_DELETE_WINDOW", self.fermer)
 
     # Méthode pour configurer l'interface graphique de l'application
     def configurer_interface(self):
@@ -122,11 +490,15 @@ class VisualisateurCSV:
         if not output_csv_file:
             messagebox.showinfo("Information", "Aucun fichier de sortie sélectionné.")
             return
+        # Écriture optionnelle d'une base SQLite d'analyse à côté du fichier CSV
+        base_sqlite = None
+        if messagebox.askyesno("Base SQLite", "Écrire aussi une base SQLite d'analyse (recommandé pour les gros volumes) ?"):
+            base_sqlite = os.path.splitext(output_csv_file)[0] + ".sqlite"
         # Conversion des fichiers XFDF en CSV
-        self.xfdf_folder_to_horizontal_csv(input_folder, output_csv_file)
+        self.xfdf_folder_to_horizontal_csv(input_folder, output_csv_file, base_sqlite)
 
     # Méthode pour traiter un dossier de fichiers XFDF et générer un CSV horizontal
-    def xfdf_folder_to_horizontal_csv(self, input_folder, output_csv_file):
+    def xfdf_folder_to_horizontal_csv(self, input_folder, output_csv_file, base_sqlite=None):
         # Ordre des colonnes dans le fichier CSV
         columns_order = [
             "A-Name", "Department",
@@ -140,52 +512,120 @@ class VisualisateurCSV:
             "Q4-Communication", "Q4-Editorial", "Q4-Administration"
         ]
         try:
-            all_rows = []
-            # Parcours de tous les fichiers du dossier
-            for file_name in os.listdir(input_folder):
-                if file_name.lower().endswith(".xfdf"):
-                    file_path = os.path.join(input_folder, file_name)
-                    tree = ET.parse(file_path)
-                    root = tree.getroot()
-                    # Initialisation d'un dictionnaire pour chaque ligne du CSV
-                    data_row = {col: "" for col in columns_order}
-                    # Extraction des valeurs des champs XFDF
-                    for field in root.findall(".//{http://ns.adobe.com/xfdf/}field"):
-                        field_name = field.get("name")
-                        value_element = field.find("{http://ns.adobe.com/xfdf/}value")
-                        field_value = value_element.text if value_element is not None else ""
-                        if field_name in data_row:
-                            data_row[field_name] = field_value
-                    all_rows.append(data_row)
-            # Écriture des données dans le fichier CSV
-            with open(output_csv_file, mode='w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=columns_order, delimiter=';')
-                writer.writeheader()
-                writer.writerows(all_rows)
-            messagebox.showinfo("Conversion réussie", f"Fichier CSV généré avec succès : {output_csv_file}")
+            # Chaque fichier est analysé isolément : un fichier invalide est mis en quarantaine sans arrêter la conversion
+            rapport = convertir_dossier_xfdf(input_folder, output_csv_file, columns_order, base_sqlite=base_sqlite)
+            if rapport["quarantaine"]:
+                messagebox.showwarning(
+                    "Conversion terminée avec erreurs",
+                    f"Fichier CSV généré : {output_csv_file}\n"
+                    f"{len(rapport['quarantaine'])} fichier(s) sur {rapport['fichiers_traites']} mis en quarantaine.\n"
+                    f"Détails : {output_csv_file}.erreurs.json"
+                )
+            else:
+                messagebox.showinfo("Conversion réussie", f"Fichier CSV généré avec succès : {output_csv_file}")
         except Exception as e:
             messagebox.showerror("Erreur", f"Erreur lors du traitement des fichiers : {e}")
 
     # Méthode pour charger un fichier CSV et mettre à jour la visualisation
     def charger_csv(self):
-        fichier = filedialog.askopenfilename(filetypes=[("Fichiers CSV", "*.csv")])
-        if fichier:
+        fichier = filedialog.askopenfilename(filetypes=[("Fichiers CSV", "*.csv"), ("Base SQLite", "*.sqlite *.db")])
+        if fichier and fichier.lower().endswith((".sqlite", ".db")):
+            self.charger_sqlite(fichier)
+        elif fichier:
             try:
-                self.df = pd.read_csv(fichier, sep=";")
-                # Mise à jour de la liste des noms pour la coloration dans le graphique réseau
-                if "A-Name" in self.df.columns:
-                    self.liste_a_names = self.df["A-Name"].unique().tolist()
+                # Le fichier est lu (ou restauré depuis le cache) avant de remplacer la source courante :
+                # en cas d'échec, le jeu de données, la base SQLite et la clé de session précédents restent en place
+                cle_session = self.cache_session.cle(fichier)
+                etat = self.cache_session.charger(cle_session)
+                if etat is not None:
+                    # Réouverture d'un fichier déjà chargé : restauration de la session précédente
+                    df = etat["df"]
+                    cache_top_n = etat["comptages"] if etat["top_n"] == self.top_n else {}
+                    pos = etat["positions"]
                 else:
-                    self.liste_a_names = []
-                self.actualiser_affichage()
+                    df = typer_colonnes(pd.read_csv(fichier, sep=";"))
+                    cache_top_n = {}
+                    pos = None
+                # Mise à jour de la liste des noms pour la coloration dans le graphique réseau
+                liste_a_names = df["A-Name"].unique().tolist() if "A-Name" in df.columns else []
             except Exception as e:
                 messagebox.showerror("Erreur de chargement", f"Impossible de charger le fichier CSV.\n{str(e)}")
+                return
+            if self.source_sql is not None:
+                self.source_sql.fermer()
+                self.source_sql = None
+            self.cle_session = cle_session
+            self.df = df
+            self.cache_top_n = cache_top_n
+            self.pos = pos
+            self.liste_a_names = liste_a_names
+            # Nouvelle source : les artistes de la vue précédente ne doivent pas être mis à jour sur place
+            self._vue = None
+            self._mise_en_page = None
+            if etat is not None:
+                question, self.type_visu_actuelle = etat["vue"]
+                self.combo_questions.set(question)
+            else:
+                self.sauvegarder_session()
+            self.actualiser_affichage()
+
+    # Méthode pour charger une base SQLite d'analyse : les comptages sont obtenus par requêtes GROUP BY
+    def charger_sqlite(self, fichier):
+        try:
+            # La nouvelle base est ouverte et lue avant de remplacer l'ancienne : en cas d'échec, la source
+            # précédente reste utilisable
+            source = SourceSQLite(fichier)
+            try:
+                noms = source.noms()
+            except Exception:
+                source.fermer()
+                raise
+            if self.source_sql is not None:
+                self.source_sql.fermer()
+            self.source_sql = source
+            self.df = None
+            self.cle_session = None
+            self.cache_top_n = {}
+            self.pos = None
+            self.liste_a_names = noms
+            # Nouvelle source : les artistes de la vue précédente ne doivent pas être mis à jour sur place
+            self._vue = None
+            self._mise_en_page = None
+            self.actualiser_affichage()
+        except Exception as e:
+            messagebox.showerror("Erreur de chargement", f"Impossible de charger la base SQLite.\n{str(e)}")
+
+    # Méthode pour enregistrer la session courante dans le cache sur disque
+    def sauvegarder_session(self):
+        if self.df is None or self.cle_session is None:
+            return
+        etat = {
+            "df": self.df,
+            "top_n": self.top_n,
+            "comptages": self.cache_top_n,
+            "positions": self.pos,
+            "vue": (self.var_question.get(), self.type_visu_actuelle),
+        }
+        try:
+            self.cache_session.sauvegarder(self.cle_session, etat)
+        except Exception as e:
+            messagebox.showwarning("Cache de session", f"Impossible d'enregistrer la session.\n{str(e)}")
+
+    # Méthode appelée à la fermeture de la fenêtre
+    def fermer(self):
+        try:
+            self.sauvegarder_session()
+        finally:
+            self.racine.destroy()
 
     # Méthode pour préparer les données en fonction de la question sélectionnée
-    def preparer_donnees(self):
+    # (avec une base SQLite, seules la heatmap et le réseau demandent les réponses détaillées)
+    def preparer_donnees(self, type_visu=None):
+        question = self.var_question.get()
+        if self.source_sql is not None:
+            return self.source_sql.preparer(question, type_visu)
         if self.df is None:
             return None
-        question = self.var_question.get()
         if question == "Department":
             # Comptage des réponses par département
             df_dept = self.df["Department"].value_counts().reset_index()
@@ -210,74 +650,165 @@ class VisualisateurCSV:
             return df_fusion
 
     # Méthode pour afficher la visualisation selon le type sélectionné
+    # Si la vue précédente a la même géométrie (même type, même nombre de catégories), ses artistes sont mis à jour
+    # sur place sans recréer les axes ; la mise en page n'est recalculée que si les libellés ou les valeurs ont changé.
+    # Le dessin est regroupé par draw_idle.
     def afficher_visualisation(self, type_visu):
-        if self.df is None:
-            return
-        self.figure.clear()
-        self.ax = self.figure.add_subplot(111)
-        donnees = self.preparer_donnees()
-        if donnees is None or donnees.empty:
-            self.ax.text(0.5, 0.5, "Aucune donnée à afficher", ha="center", va="center")
-            self.canvas.draw()
+        if self.df is None and self.source_sql is None:
             return
+        question = self.var_question.get()
         try:
-            # Sélection du type de graphique à afficher
-            if type_visu == "barres":
-                self._afficher_barres(donnees)
-            elif type_visu == "heatmap":
-                self._afficher_heatmap(donnees)
-            elif type_visu == "reseau":
-                self._afficher_reseau(donnees)
-            elif type_visu == "pie":
-                self._afficher_pie(donnees)
-            elif type_visu == "line":
-                self._afficher_line(donnees)
+            comptage = None
+            if type_visu in TYPES_VISU_INCREMENTAUX:
+                comptage = self.cache_top_n.get((question, self.top_n))
+            if comptage is not None:
+                if self._signature_vue(type_visu, comptage) == self._vue:
+                    self._actualiser_vue(type_visu, comptage)
+                    self._ajuster_mise_en_page(comptage)
+                    self.canvas.draw_idle()
+                    return
+                # Les comptages en cache suffisent : inutile de préparer à nouveau les données
+                donnees = None
+            else:
+                donnees = self.preparer_donnees(type_visu)
+            self.figure.clear()
+            self.ax = self.figure.add_subplot(111)
+            self._vue = None
+            self._mise_en_page = None
+            if comptage is None and (donnees is None or donnees.empty):
+                self.ax.text(0.5, 0.5, "Aucune donnée à afficher", ha="center", va="center")
+                self.canvas.draw_idle()
+                return
+            self._tracer(type_visu, donnees)
             self.figure.tight_layout()
-            self.canvas.draw()
+            if type_visu in TYPES_VISU_INCREMENTAUX:
+                self._mise_en_page = self._cle_mise_en_page(self.compter_top_n(donnees))
+            self.canvas.draw_idle()
         except Exception as e:
             messagebox.showerror("Erreur de visualisation", f"Erreur de visualisation : {str(e)}")
 
+    # Méthode privée retournant ce dont dépend la mise en page : la question (libellés des axes et titre),
+    # les catégories (étiquettes des graduations) et les valeurs (graduations de l'axe des valeurs)
+    def _cle_mise_en_page(self, comptage):
+        return (self.var_question.get(), tuple(comptage.index), tuple(comptage.values))
+
+    # Méthode privée pour recalculer la mise en page uniquement si les libellés ou les valeurs ont changé
+    def _ajuster_mise_en_page(self, comptage):
+        cle = self._cle_mise_en_page(comptage)
+        if cle != self._mise_en_page:
+            self.figure.tight_layout()
+            self._mise_en_page = cle
+
+    # Méthode privée retournant la signature géométrique d'une vue : deux vues de même signature partagent
+    # les mêmes axes et artistes (seules les données, les libellés et les couleurs changent)
+    def _signature_vue(self, type_visu, comptage):
+        if type_visu == "barres":
+            return (type_visu, self.var_question.get() == "Q2", len(comptage))
+        return (type_visu, len(comptage))
+
+    # Méthode privée pour mettre à jour sur place les artistes de la vue courante
+    def _actualiser_vue(self, type_visu, comptage):
+        if type_visu == "barres":
+            self._actualiser_barres(comptage)
+        elif type_visu == "pie":
+            self._actualiser_pie(comptage)
+        elif type_visu == "line":
+            self._actualiser_line(comptage)
+
+    # Méthode privée pour tracer le graphique correspondant au type sélectionné
+    def _tracer(self, type_visu, donnees):
+        if type_visu == "barres":
+            self._afficher_barres(donnees)
+        elif type_visu == "heatmap":
+            self._afficher_heatmap(donnees)
+        elif type_visu == "reseau":
+            self._afficher_reseau(donnees)
+        elif type_visu == "pie":
+            self._afficher_pie(donnees)
+        elif type_visu == "line":
+            self._afficher_line(donnees)
+
+    # Méthode pour compter les réponses d'une question et les limiter aux N premières catégories
+    # (le résultat est mis en cache par question, car il ne dépend que des données chargées)
+    def compter_top_n(self, donnees, question=None):
+        question = question or self.var_question.get()
+        cle = (question, self.top_n)
+        if cle not in self.cache_top_n:
+            colonne = "Department" if question == "Department" else "Réponse" if question == "Q2" else "Catégorie"
+            if "count" in donnees.columns:
+                # Comptages déjà agrégés (départements ou requête GROUP BY de la base SQLite)
+                comptage = donnees.set_index(colonne)["count"]
+            else:
+                comptage = donnees[colonne].value_counts(sort=False)
+            # Les catégories absentes des données (colonnes catégorielles) sont ignorées
+            comptage = comptage[comptage > 0]
+            self.cache_top_n[cle] = limit_top_n(comptage, self.top_n)
+        return self.cache_top_n[cle]
+
     # Méthode privée pour afficher un graphique en barres
     def _afficher_barres(self, donnees):
         question = self.var_question.get()
+        comptage = self.compter_top_n(donnees)
         if question == "Department":
-            donnees = donnees.sort_values("count", ascending=False)
-            if len(donnees) > 20:
-                top19 = donnees.iloc[:19]
-                other_count = donnees["count"].iloc[19:].sum()
-                donnees = pd.concat([top19, pd.DataFrame([["Other", other_count]], columns=["Department", "count"])], ignore_index=True)
-            sns.barplot(x='count', y='Department', data=donnees, ax=self.ax, palette="viridis")
-            self.ax.set_xlabel("Nombre de répondants")
+            sns.barplot(x=comptage.values, y=comptage.index, ax=self.ax, palette="viridis")
         elif question == "Q2":
-            comptage = donnees["Réponse"].value_counts().sort_values(ascending=False)
-            if len(comptage) > 20:
-                top19 = comptage.iloc[:19]
-                other_count = comptage.iloc[19:].sum()
-                comptage = pd.concat([top19, pd.Series([other_count], index=["Other"])])
             comptage.plot(kind="bar", ax=self.ax, color="skyblue")
-            self.ax.set_ylabel("Mentions")
         else:
-            comptage = donnees["Catégorie"].value_counts().sort_values(ascending=False)
-            if len(comptage) > 20:
-                top19 = comptage.iloc[:19]
-                other_count = comptage.iloc[19:].sum()
-                comptage = pd.concat([top19, pd.Series([other_count], index=["Other"])])
             sns.barplot(x=comptage.values, y=comptage.index, ax=self.ax, palette="rocket")
-            self.ax.set_ylabel("Réponses 'Oui'")
         self.ax.tick_params(axis="x", rotation=45)
+        # Seaborn peut créer un conteneur par barre : les barres sont rassemblées dans l'ordre des catégories
+        barres = [barre for conteneur in self.ax.containers for barre in conteneur]
+        if question == "Q2":
+            self._artistes = sorted(barres, key=lambda barre: barre.get_x())
+        else:
+            self._artistes = sorted(barres, key=lambda barre: barre.get_y())
+        self._vue = self._signature_vue("barres", comptage)
+        self._actualiser_barres(comptage)
+
+    # Méthode privée pour mettre à jour les barres, les libellés et les couleurs selon la question
+    def _actualiser_barres(self, comptage):
+        question = self.var_question.get()
+        positions = range(len(comptage))
+        if question == "Q2":
+            for barre, valeur in zip(self._artistes, comptage.values):
+                barre.set_height(valeur)
+                barre.set_facecolor("skyblue")
+            self.ax.set_xticks(positions, labels=comptage.index)
+            self.ax.set_xlabel("Réponse")
+            self.ax.set_ylabel("Mentions")
+        else:
+            palette = sns.color_palette("viridis" if question == "Department" else "rocket", len(comptage))
+            for barre, valeur, couleur in zip(self._artistes, comptage.values, palette):
+                barre.set_width(valeur)
+                barre.set_facecolor(couleur)
+            self.ax.set_yticks(positions, labels=comptage.index)
+            if question == "Department":
+                self.ax.set_xlabel("Nombre de répondants")
+                self.ax.set_ylabel("Department")
+            else:
+                self.ax.set_xlabel("")
+                self.ax.set_ylabel("Réponses 'Oui'")
+        self.ax.relim()
+        self.ax.autoscale_view()
 
     # Méthode privée pour afficher une matrice de chaleur (pour Q2)
     def _afficher_heatmap(self, donnees):
         question = self.var_question.get()
         if question == "Q2":
-            matrice = pd.crosstab(donnees["A-Name"], donnees["Réponse"])
+            # Les colonnes sont limitées aux réponses du top N, les autres sont regroupées sous "Other"
+            top = self.compter_top_n(donnees).index
+            reponses = donnees["Réponse"].astype(object)
+            reponses = reponses.where(reponses.isin(top), "Other")
+            matrice = pd.crosstab(donnees["A-Name"], reponses)
             sns.heatmap(matrice, ax=self.ax, cmap="YlGnBu", cbar_kws={'label': 'Mentions'})
             self.ax.tick_params(axis="x", rotation=45)
 
     # Méthode privée pour afficher un graphique réseau
     def _afficher_reseau(self, donnees):
         self.G = nx.from_pandas_edgelist(donnees, "A-Name", "Réponse")
-        self.pos = nx.spring_layout(self.G, k=0.3)
+        # Les positions déjà calculées (ou restaurées depuis le cache de session) sont réutilisées
+        if self.pos is None or set(self.pos) != set(self.G.nodes()):
+            self.pos = nx.spring_layout(self.G, k=0.3)
         self._redessiner_reseau()
 
     # Méthode privée pour redessiner le graphique réseau (utile lors du zoom)
@@ -297,73 +828,76 @@ class VisualisateurCSV:
         legend_elements = [Patch(facecolor='#1f77b4', edgecolor='black', label='A-Name'),
                            Patch(facecolor='#2ca02c', edgecolor='black', label='Autres noms')]
         self.ax.legend(handles=legend_elements, loc='upper right')
-        self.canvas.draw()
-        self.lbl_legende.config(text="Bleu - A-Name   |   Vert - Autres participants")
+        # Les nœuds (première collection) sont conservés pour que le zoom ne modifie que leur taille
+        self._artistes = self.ax.collections[0]
+        self._vue = ("reseau",)
+        self.canvas.draw_idle()
+        # Le label de légende n'existe pas en mode rapport (sans interface graphique)
+        if self.lbl_legende is not None:
+            self.lbl_legende.config(text="Bleu - A-Name   |   Vert - Autres participants")
 
     # Méthode privée pour afficher un graphique en secteurs
     def _afficher_pie(self, donnees):
+        comptage = self.compter_top_n(donnees)
+        self._artistes = self.ax.pie(comptage, labels=comptage.index, autopct='%1.1f%%', startangle=140)
+        self._vue = self._signature_vue("pie", comptage)
+        self._actualiser_pie(comptage)
+
+    # Méthode privée pour mettre à jour les secteurs (angles, étiquettes et pourcentages) et le titre
+    # Les positions reprennent le calcul de Axes.pie (étiquettes à 1.1 et pourcentages à 0.6 du rayon)
+    def _actualiser_pie(self, comptage):
         question = self.var_question.get()
+        secteurs, etiquettes, pourcentages = self._artistes
+        fractions = comptage.values / comptage.values.sum()
+        debut = 140.0
+        for secteur, etiquette, pourcentage, libelle, fraction in zip(secteurs, etiquettes, pourcentages,
+                                                                      comptage.index, fractions):
+            fin = debut + 360.0 * fraction
+            milieu = math.radians((debut + fin) / 2)
+            secteur.set_theta1(debut)
+            secteur.set_theta2(fin)
+            secteur.set_label(libelle)
+            etiquette.set_text(libelle)
+            etiquette.set_position((1.1 * math.cos(milieu), 1.1 * math.sin(milieu)))
+            etiquette.set_horizontalalignment("left" if math.cos(milieu) > 0 else "right")
+            pourcentage.set_text('%1.1f%%' % (100.0 * fraction))
+            pourcentage.set_position((0.6 * math.cos(milieu), 0.6 * math.sin(milieu)))
+            debut = fin
         if question == "Department":
-            donnees = donnees.sort_values("count", ascending=False)
-            if len(donnees) > 20:
-                top19 = donnees.iloc[:19]
-                other_count = donnees["count"].iloc[19:].sum()
-                donnees = pd.concat([top19, pd.DataFrame([["Other", other_count]], columns=["Department", "count"])], ignore_index=True)
-            self.ax.pie(donnees["count"], labels=donnees["Department"], autopct='%1.1f%%', startangle=140)
             self.ax.set_title("Répartition par Département")
-        elif question == "Q2":
-            comptage = donnees["Réponse"].value_counts().sort_values(ascending=False)
-            if len(comptage) > 20:
-                top19 = comptage.iloc[:19]
-                other_count = comptage.iloc[19:].sum()
-                comptage = pd.concat([top19, pd.Series([other_count], index=["Other"])])
-            self.ax.pie(comptage, labels=comptage.index, autopct='%1.1f%%', startangle=140)
-            self.ax.set_title("Répartition des réponses Q2")
         else:
-            comptage = donnees["Catégorie"].value_counts().sort_values(ascending=False)
-            if len(comptage) > 20:
-                top19 = comptage.iloc[:19]
-                other_count = comptage.iloc[19:].sum()
-                comptage = pd.concat([top19, pd.Series([other_count], index=["Other"])])
-            self.ax.pie(comptage, labels=comptage.index, autopct='%1.1f%%', startangle=140)
             self.ax.set_title(f"Répartition des réponses {question}")
 
     # Méthode privée pour afficher un graphique en lignes
     def _afficher_line(self, donnees):
+        comptage = self.compter_top_n(donnees)
+        (self._artistes,) = self.ax.plot(range(len(comptage)), comptage.values, marker='o')
+        self.ax.tick_params(axis="x", rotation=45)
+        self._vue = self._signature_vue("line", comptage)
+        self._actualiser_line(comptage)
+
+    # Méthode privée pour mettre à jour la courbe, les libellés et la couleur selon la question
+    def _actualiser_line(self, comptage):
         question = self.var_question.get()
+        self._artistes.set_ydata(comptage.values)
+        self.ax.set_xticks(range(len(comptage)), labels=comptage.index)
         if question == "Department":
-            donnees = donnees.sort_values("count", ascending=False)
-            if len(donnees) > 20:
-                top19 = donnees.iloc[:19]
-                other_count = donnees["count"].iloc[19:].sum()
-                donnees = pd.concat([top19, pd.DataFrame([["Other", other_count]], columns=["Department", "count"])], ignore_index=True)
-            self.ax.plot(donnees["Department"], donnees["count"], marker='o', color='green')
+            self._artistes.set_color("green")
             self.ax.set_xlabel("Department")
             self.ax.set_ylabel("Nombre de répondants")
             self.ax.set_title("Tendance par Département")
-            self.ax.tick_params(axis="x", rotation=45)
         elif question == "Q2":
-            comptage = donnees["Réponse"].value_counts().sort_values(ascending=False)
-            if len(comptage) > 20:
-                top19 = comptage.iloc[:19]
-                other_count = comptage.iloc[19:].sum()
-                comptage = pd.concat([top19, pd.Series([other_count], index=["Other"])])
-            self.ax.plot(comptage.index, comptage.values, marker='o', color='blue')
+            self._artistes.set_color("blue")
             self.ax.set_xlabel("Réponse")
             self.ax.set_ylabel("Mentions")
             self.ax.set_title("Tendance des mentions Q2")
-            self.ax.tick_params(axis="x", rotation=45)
         else:
-            comptage = donnees["Catégorie"].value_counts().sort_values(ascending=False)
-            if len(comptage) > 20:
-                top19 = comptage.iloc[:19]
-                other_count = comptage.iloc[19:].sum()
-                comptage = pd.concat([top19, pd.Series([other_count], index=["Other"])])
-            self.ax.plot(comptage.index, comptage.values, marker='o', color='purple')
+            self._artistes.set_color("purple")
             self.ax.set_xlabel("Catégorie")
             self.ax.set_ylabel("Réponses 'Oui'")
             self.ax.set_title(f"Tendance des réponses {question}")
-            self.ax.tick_params(axis="x", rotation=45)
+        self.ax.relim()
+        self.ax.autoscale_view()
 
     # Méthode pour gérer le zoom via la molette de la souris sur le graphique réseau
     def gestion_zoom(self, event):
@@ -371,7 +905,11 @@ class VisualisateurCSV:
             return
         facteur = self.ZOOM_IN_FACTOR if event.button == 'up' else self.ZOOM_OUT_FACTOR
         self.echelle_actuelle = max(self.MIN_ZOOM, min(self.echelle_actuelle * facteur, self.MAX_ZOOM))
-        if self.G is not None:
+        if self.G is not None and self._vue == ("reseau",):
+            # Seule la taille des nœuds change : mise à jour sur place puis dessin regroupé
+            self._artistes.set_sizes([self.BASE_TAILLE_NOEUD * self.echelle_actuelle])
+            self.canvas.draw_idle()
+        elif self.G is not None:
             self._redessiner_reseau()
 
     # Méthode pour changer le type de visualisation et rafraîchir l'affichage
@@ -394,9 +932,154 @@ class VisualisateurCSV:
             self.btn_reseau.config(state=tk.DISABLED)
         self.afficher_visualisation(self.type_visu_actuelle)
 
+# Variable minimale remplaçant tk.StringVar lorsque aucune fenêtre Tk n'existe
+class _VariableSimple:
+    def __init__(self, valeur=""):
+        self._valeur = valeur
+
+    def get(self):
+        return self._valeur
+
+    def set(self, valeur):
+        self._valeur = valeur
+
+# Classe de rendu sans interface graphique : réutilise les méthodes _afficher_* sur une figure Agg
+class RapportVisualisation(VisualisateurCSV):
+    def __init__(self, df=None, liste_a_names=None, top_n=VisualisateurCSV.TOP_N):
+        self.df = df
+        self.source_sql = None
+        self.top_n = top_n
+        self._vue = None
+        self._artistes = None
+        self._mise_en_page = None
+        self.cache_top_n = {}
+        self.G = None
+        self.pos = None
+        self.liste_a_names = liste_a_names or []
+        self.echelle_actuelle = 1.0
+        self.var_question = _VariableSimple()
+        self.lbl_legende = None
+        self.figure = plt.Figure(figsize=(10,7), dpi=100)
+        self.canvas = FigureCanvasAgg(self.figure)
+
+    # Calcule une seule fois les données préparées et les comptages top-N de chaque question
+    # (seules les questions ayant des données ont un comptage dans cache_top_n)
+    def preparer_toutes_questions(self):
+        agregats = {}
+        for question in QUESTIONS:
+            self.var_question.set(question)
+            agregats[question] = self.preparer_donnees()
+            if agregats[question] is not None and not agregats[question].empty:
+                self.compter_top_n(agregats[question], question)
+        return agregats
+
+    # Trace un graphique et l'enregistre dans chacun des fichiers demandés
+    # Les barres, secteurs et lignes n'utilisent que les comptages en cache ; donnees (réponses détaillées)
+    # n'est nécessaire que pour la heatmap et le réseau
+    def rendre(self, question, type_visu, chemins, donnees=None):
+        self.var_question.set(question)
+        self.figure.clear()
+        self.ax = self.figure.add_subplot(111)
+        if (question, self.top_n) not in self.cache_top_n:
+            self.ax.text(0.5, 0.5, "Aucune donnée à afficher", ha="center", va="center")
+        else:
+            self._tracer(type_visu, donnees)
+            self.ax.set_title(self.ax.get_title() or f"{question} - {type_visu}")
+        self.figure.tight_layout()
+        for chemin in chemins:
+            self.figure.savefig(chemin)
+        return chemins
+
+# Agrégats partagés par les processus de rendu (transmis une seule fois à chaque processus) : comptages top-N,
+# réponses détaillées de Q2 (heatmap et réseau) et noms des répondants présents dans le réseau
+_AGREGATS_RAPPORT = {}
+
+# Initialisation d'un processus de rendu avec les agrégats calculés par le processus principal
+def _initialiser_processus_rapport(agregats):
+    global _AGREGATS_RAPPORT
+    matplotlib.use("Agg")
+    _AGREGATS_RAPPORT = agregats
+
+# Rendu d'une figure du rapport dans un processus de la pool
+def _rendre_figure_rapport(tache):
+    perimetre, question, type_visu, chemins = tache
+    agregat = _AGREGATS_RAPPORT[perimetre]
+    rendu = RapportVisualisation(liste_a_names=agregat["noms"], top_n=agregat["top_n"])
+    rendu.cache_top_n = dict(agregat["comptages"])
+    donnees = agregat["q2"] if type_visu in TYPES_VISU_Q2 else None
+    return rendu.rendre(question, type_visu, chemins, donnees)
+
+# Nettoyage d'un nom de département pour l'utiliser comme nom de dossier
+def _nom_dossier(nom):
+    return re.sub(r"[^\w\-]+", "_", str(nom)).strip("_") or "Inconnu"
+
+# Fonction pour générer un rapport complet (toutes les questions et tous les graphiques) sans interface
+def generer_rapport(fichier_csv, dossier_sortie, formats=("png",), par_departement=False, processus=None,
+                    top_n=VisualisateurCSV.TOP_N):
+    matplotlib.use("Agg")
+    df = typer_colonnes(pd.read_csv(fichier_csv, sep=";"))
+    # Périmètres du rapport, indexés par nom de dossier : l'ensemble des données ("Tous"), puis chaque
+    # département si demandé. Un nom de dossier déjà pris ("Tous" ou deux départements dont les noms nettoyés
+    # coïncident, sans tenir compte de la casse) reçoit un suffixe numérique.
+    perimetres = {"Tous": df}
+    if par_departement and "Department" in df.columns:
+        pris = {"tous"}
+        for departement, df_dept in df.groupby("Department", observed=True):
+            base = _nom_dossier(departement)
+            nom, suffixe = base, 2
+            while nom.lower() in pris:
+                nom, suffixe = f"{base}_{suffixe}", suffixe + 1
+            pris.add(nom.lower())
+            perimetres[nom] = df_dept
+    # Calcul des agrégats une seule fois par périmètre et par question
+    agregats = {}
+    for perimetre, df_perimetre in perimetres.items():
+        noms = df_perimetre["A-Name"].unique().tolist() if "A-Name" in df_perimetre.columns else []
+        preparation = RapportVisualisation(df_perimetre, noms, top_n)
+        q2 = preparation.preparer_toutes_questions()["Q2"]
+        # Seuls les noms présents dans le réseau Q2 servent à la coloration des nœuds
+        if q2 is not None:
+            noeuds = set(q2["A-Name"]) | set(q2["Réponse"])
+            noms = [nom for nom in noms if nom in noeuds]
+        agregats[perimetre] = {"noms": noms, "q2": q2, "top_n": top_n, "comptages": preparation.cache_top_n}
+    # Construction de la liste des figures à produire
+    taches = []
+    for perimetre in perimetres:
+        dossier = os.path.join(dossier_sortie, perimetre)
+        os.makedirs(dossier, exist_ok=True)
+        for question in QUESTIONS:
+            for type_visu in TYPES_VISU:
+                if question != "Q2" and type_visu in TYPES_VISU_Q2:
+                    continue
+                chemins = [os.path.join(dossier, f"{question}_{type_visu}.{fmt}") for fmt in formats]
+                taches.append((perimetre, question, type_visu, chemins))
+    # Rendu parallèle des figures
+    fichiers = []
+    with ProcessPoolExecutor(max_workers=processus, initializer=_initialiser_processus_rapport,
+                             initargs=(agregats,)) as pool:
+        for chemins in pool.map(_rendre_figure_rapport, taches):
+            fichiers.extend(chemins)
+    return fichiers
+
 # Bloc principal pour démarrer l'application
 if __name__ == "__main__":
-    racine = tk.Tk()
-    app = VisualisateurCSV(racine)
-    racine.geometry("1200x800")
-    racine.mainloop()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="XFDF2CSV Visualizer")
+    parser.add_argument("--rapport", metavar="CSV", help="Génère un rapport de tous les graphiques sans interface graphique")
+    parser.add_argument("--sortie", default="rapport", help="Dossier de sortie du rapport (défaut : rapport)")
+    parser.add_argument("--formats", nargs="+", default=["png"], choices=FORMATS_RAPPORT, help="Formats des figures")
+    parser.add_argument("--par-departement", action="store_true", help="Génère aussi un rapport pour chaque département")
+    parser.add_argument("--processus", type=int, default=None, help="Nombre de processus de rendu")
+    parser.add_argument("--top-n", type=int, default=VisualisateurCSV.TOP_N,
+                        help="Nombre de catégories affichées avant regroupement sous \"Other\" (défaut : 20)")
+    args = parser.parse_args()
+    if args.top_n < 2:
+        parser.error("--top-n doit être au moins 2")
+    if args.rapport:
+        fichiers = generer_rapport(args.rapport, args.sortie, args.formats, args.par_departement, args.processus,
+                                   args.top_n)
+        print(f"Rapport généré : {len(fichiers)} fichiers dans {args.sortie}")
+    else:
+        racine = tk.Tk()
+        app = VisualisateurCSV(racine)
+        racine.geometry("1200x800")
+        racine.mainloop()
\ No newline at end of file
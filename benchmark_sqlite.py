@@ -0,0 +1,83 @@
+# Comparaison des temps d'agrégation : pandas (melt + value_counts) et base SQLite (GROUP BY)
+# Utilisation : python benchmark_sqlite.py [--tailles 100000 1000000]
+import argparse
+import importlib.util
+import os
+import random
+import sys
+import tempfile
+import time
+import pandas as pd
+
+# Chargement du module principal (son nom de fichier contient un espace)
+_chemin_module = os.path.join(os.path.dirname(os.path.abspath(__file__)), "XFDF2CSV Visualizer.py")
+_spec = importlib.util.spec_from_file_location("xfdf2csv_visualizer", _chemin_module)
+visualizer = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = visualizer
+_spec.loader.exec_module(visualizer)
+
+DEPARTEMENTS = ["IT", "Comptabilite", "Multimedia", "Gestion de projet", "Communication", "Editorial", "Administration"]
+COLONNES = (["A-Name", "Department"]
+            + [f"Q1-{d}" for d in DEPARTEMENTS]
+            + [f"Q2-Name{i}" for i in range(1, 10)]
+            + [f"Q3-{d}" for d in DEPARTEMENTS]
+            + [f"Q4-{d}" for d in DEPARTEMENTS])
+
+# Génération de réponses synthétiques (noms cités pour Q2, "Oui"/"Non" pour les autres questions)
+def generer_lignes(nombre, graine=0):
+    aleatoire = random.Random(graine)
+    for i in range(nombre):
+        ligne = {"A-Name": f"Personne {i}", "Department": aleatoire.choice(DEPARTEMENTS)}
+        for col in COLONNES[2:]:
+            if col.startswith("Q2-"):
+                ligne[col] = f"Personne {aleatoire.randrange(nombre)}" if aleatoire.random() < 0.6 else "----"
+            else:
+                ligne[col] = "Oui" if aleatoire.random() < 0.3 else "Non"
+        yield f"{i}.xfdf", ligne
+
+# Mesure de la durée d'une fonction (meilleur de plusieurs essais)
+def chronometrer(fonction, essais=3):
+    meilleur = None
+    for _ in range(essais):
+        debut = time.perf_counter()
+        fonction()
+        duree = time.perf_counter() - debut
+        meilleur = duree if meilleur is None else min(meilleur, duree)
+    return meilleur
+
+def comparer(nombre, dossier):
+    lignes = list(generer_lignes(nombre))
+    df = visualizer.typer_colonnes(pd.DataFrame([ligne for _, ligne in lignes], columns=COLONNES))
+    chemin_base = os.path.join(dossier, f"bench_{nombre}.sqlite")
+    source = visualizer.SourceSQLite(chemin_base, creer=True)
+    for debut in range(0, len(lignes), visualizer.TAILLE_LOT_XFDF):
+        source.inserer(lignes[debut:debut + visualizer.TAILLE_LOT_XFDF])
+    source.indexer()
+    del lignes
+    print(f"\n{nombre} répondants")
+    print(f"{'Question':<12}{'pandas (s)':>12}{'SQLite (s)':>12}{'rapport':>10}")
+    for question in visualizer.QUESTIONS:
+        # Visualiseur sans cache : chaque mesure refait la préparation et le comptage complets
+        def par_pandas():
+            rendu = visualizer.RapportVisualisation(df)
+            rendu.var_question.set(question)
+            rendu.compter_top_n(rendu.preparer_donnees("barres"))
+
+        def par_sqlite():
+            rendu = visualizer.RapportVisualisation()
+            rendu.source_sql = source
+            rendu.var_question.set(question)
+            rendu.compter_top_n(rendu.preparer_donnees("barres"))
+
+        duree_pandas = chronometrer(par_pandas)
+        duree_sqlite = chronometrer(par_sqlite)
+        print(f"{question:<12}{duree_pandas:>12.3f}{duree_sqlite:>12.3f}{duree_pandas / duree_sqlite:>9.1f}x")
+    source.fermer()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark des agrégations pandas et SQLite")
+    parser.add_argument("--tailles", nargs="+", type=int, default=[100000, 1000000], help="Nombres de répondants")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as dossier:
+        for nombre in args.tailles:
+            comparer(nombre, dossier)